@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from uuid import uuid4
 from app.core.supabase_client import supabase, get_current_user
+from app.core.http_cache import conditional_get, bump_version
 from openai import OpenAI
 import os
 
@@ -71,8 +72,8 @@ def enforce_ad_limit(user_id: str):
 
 # ===================== ROUTES =====================
 @router.get("/usage")
-def get_usage(user=Depends(get_current_user)):
-    try:
+def get_usage(request: Request, response: Response, user=Depends(get_current_user)):
+    def load():
         # Count generated ads by this user
         ads = supabase.from_("generated_ads").select("id").eq("user_id", user.id).execute()
         usage_count = len(ads.data) if ads.data else 0
@@ -98,6 +99,9 @@ def get_usage(user=Depends(get_current_user)):
             "limit": plan_limit
         }
 
+    try:
+        scopes = [("generated_ads", user.id), ("user_profile", user.id)]
+        return conditional_get(request, response, ("usage", user.id), scopes, load)
     except Exception as e:
         print("❌ Error in /usage:", str(e))
         raise HTTPException(status_code=500, detail="Error getting usage: " + str(e))
@@ -115,6 +119,7 @@ def create_ad(ad: AdCreate, user=Depends(get_current_user)):
             "template_id": ad.template_id,
             "language": ad.language,
         }).execute()
+        bump_version("generated_ads", user.id)
         data = response.data
         if not data:
             raise HTTPException(status_code=500, detail="No data returned after insert")
@@ -124,10 +129,13 @@ def create_ad(ad: AdCreate, user=Depends(get_current_user)):
 
 
 @router.get("/", response_model=List[AdOut])
-def get_ads(user=Depends(get_current_user)):
+def get_ads(request: Request, response: Response, user=Depends(get_current_user)):
+    def load():
+        result = supabase.from_("generated_ads").select("*").eq("user_id", user.id).order("created_at", desc=True).execute()
+        return result.data
+
     try:
-        response = supabase.from_("generated_ads").select("*").eq("user_id", user.id).order("created_at", desc=True).execute()
-        return response.data
+        return conditional_get(request, response, ("ads", user.id), [("generated_ads", user.id)], load)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal Server Error: " + str(e))
 
@@ -151,6 +159,7 @@ def update_ad(ad_id: str, ad: AdUpdate, user=Depends(get_current_user)):
             raise HTTPException(status_code=400, detail="No fields to update")
 
         response = supabase.table("generated_ads").update(update_data).eq("id", ad_id).eq("user_id", user.id).execute()
+        bump_version("generated_ads", user.id)
         if not response.data:
             raise HTTPException(status_code=404, detail="Ad not found or not updated")
         return response.data[0]
@@ -162,6 +171,7 @@ def update_ad(ad_id: str, ad: AdUpdate, user=Depends(get_current_user)):
 def delete_ad(ad_id: str, user=Depends(get_current_user)):
     try:
         response = supabase.from_("generated_ads").delete().eq("id", ad_id).eq("user_id", user.id).execute()
+        bump_version("generated_ads", user.id)
         return {"message": "Ad deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error deleting ad: " + str(e))
@@ -199,6 +209,7 @@ def generate_ad(data: GenerateRequest = Body(...), user=Depends(get_current_user
             "template_id": data.template_id,
             "language": "en"
         }).execute()
+        bump_version("generated_ads", user.id)
 
         if not insert_result.data:
             raise HTTPException(status_code=500, detail="Failed to save ad")
@@ -239,6 +250,7 @@ def custom_generate_ad(data: AdCreate, user=Depends(get_current_user)):
             "description": generated,
             "language": data.language or "en"
         }).execute()
+        bump_version("generated_ads", user.id)
 
         return {"prompt": prompt, "description": generated}
 
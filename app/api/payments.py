@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from app.core.supabase_client import get_current_user
 from app.core.config import settings
+import asyncio
 import stripe
+import time
 
 router = APIRouter()
 stripe.api_key = settings.STRIPE_SECRET_KEY
@@ -19,12 +22,49 @@ PRICE_LOOKUP = {
     }
 }
 
+# Open checkout sessions are reused for a short while so double clicks and
+# retries get the same checkout_url instead of a new Stripe session.
+CHECKOUT_SESSION_TTL_SECONDS = 10 * 60
+
+_open_sessions = {}     # (user_id, plan_id, plan_type) -> (checkout_url, expires_at)
+_pending_sessions = {}  # (user_id, plan_id, plan_type) -> asyncio.Task
+_generations = {}       # user_id -> bumped when their sessions are forgotten
+
 class CheckoutRequest(BaseModel):
     plan_id: str      # e.g. "pro"
     plan_type: str    # e.g. "monthly" or "yearly"
 
+def _create_stripe_session(key, customer_email, user_id, price_id):
+    # Same key within one TTL window -> Stripe returns the same session, even
+    # across workers that don't share _open_sessions.
+    window = int(time.time() // CHECKOUT_SESSION_TTL_SECONDS)
+    generation = _generations.get(user_id, 0)
+    idempotency_key = "checkout-" + "-".join(key) + f"-{generation}-{window}"
+
+    return stripe.checkout.Session.create(
+        customer_email=customer_email,
+        client_reference_id=user_id,  # ← Supabase UUID
+        payment_method_types=["card"],
+        mode="subscription",
+        line_items=[{
+            "price": price_id,
+            "quantity": 1
+        }],
+        success_url="http://localhost:5173/success?session_id={CHECKOUT_SESSION_ID}",
+        cancel_url="http://localhost:5173/cancel",
+        idempotency_key=idempotency_key,
+    )
+
+
+def forget_checkout_sessions(user_id: str):
+    """Drop cached checkout sessions for a user, e.g. once one has completed."""
+    _generations[user_id] = _generations.get(user_id, 0) + 1
+    for key in [k for k in _open_sessions if k[0] == user_id]:
+        _open_sessions.pop(key, None)
+
+
 @router.post("/checkout")
-def create_checkout_session(data: CheckoutRequest, user=Depends(get_current_user)):
+async def create_checkout_session(data: CheckoutRequest, user=Depends(get_current_user)):
     try:
         customer_email = user.email or user.user_metadata.get("email")
         price_id = PRICE_LOOKUP.get(data.plan_id, {}).get(data.plan_type)
@@ -32,18 +72,29 @@ def create_checkout_session(data: CheckoutRequest, user=Depends(get_current_user
         if not price_id:
             raise HTTPException(status_code=400, detail="Invalid plan selection")
 
-        session = stripe.checkout.Session.create(
-            customer_email=customer_email,
-            client_reference_id=user.id,  # ← Supabase UUID
-            payment_method_types=["card"],
-            mode="subscription",
-            line_items=[{
-                "price": price_id,
-                "quantity": 1
-            }],
-            success_url="http://localhost:5173/success?session_id={CHECKOUT_SESSION_ID}",
-            cancel_url="http://localhost:5173/cancel",
-        )
+        key = (user.id, data.plan_id, data.plan_type)
+        cached = _open_sessions.get(key)
+        if cached and cached[1] > time.time():
+            return {"checkout_url": cached[0]}
+
+        # Concurrent clicks wait on the request already talking to Stripe.
+        task = _pending_sessions.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                run_in_threadpool(_create_stripe_session, key, customer_email, user.id, price_id)
+            )
+            _pending_sessions[key] = task
+            task.add_done_callback(lambda _: _pending_sessions.pop(key, None))
+        session = await asyncio.shield(task)
+
+        now = time.time()
+        for stale in [k for k, v in _open_sessions.items() if v[1] <= now]:
+            _open_sessions.pop(stale, None)
+
+        expires_at = now + CHECKOUT_SESSION_TTL_SECONDS
+        if session.get("expires_at"):
+            expires_at = min(expires_at, session["expires_at"] - 60)
+        _open_sessions[key] = (session.url, expires_at)
 
         return {"checkout_url": session.url}
 
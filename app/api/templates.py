@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel
 from typing import List
 from app.core.supabase_client import get_current_user
 from app.core.supabase_client import supabase
+from app.core.http_cache import conditional_get, bump_version
 from openai import OpenAI
 from uuid import uuid4
 import os
@@ -36,22 +37,26 @@ class GenerateResponse(BaseModel):
     ad_text: str
 
 @router.get("/", response_model=List[Template])
-def get_templates():
+def get_templates(request: Request, response: Response):
+    def load():
+        result = supabase.from_("templates").select("*").order("created_at", desc=True).execute()
+        return result.data or []
+
     try:
-        response = supabase.from_("templates").select("*").order("created_at", desc=True).execute()
-        if not response.data:
-            return []
-        return response.data
+        return conditional_get(request, response, ("templates",), [("templates", None)], load)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to load templates: " + str(e))
 
 @router.get("/{template_id}", response_model=Template)
-def get_template(template_id: str):
-    try:
-        response = supabase.from_("templates").select("*").eq("id", template_id).single().execute()
-        if not response.data:
+def get_template(template_id: str, request: Request, response: Response):
+    def load():
+        result = supabase.from_("templates").select("*").eq("id", template_id).single().execute()
+        if not result.data:
             raise HTTPException(status_code=404, detail="Template not found")
-        return response.data
+        return result.data
+
+    try:
+        return conditional_get(request, response, ("template", template_id), [("templates", None)], load)
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to fetch template: " + str(e))
 
@@ -99,6 +104,7 @@ def create_template(template: TemplateCreate, user=Depends(get_current_user)):
             "prompt": template.prompt,
             "example": template.example
         }).execute()
+        bump_version("templates")
 
         if not response.data:
             raise HTTPException(status_code=500, detail="Failed to create template")
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request, HTTPException
 from app.core.config import settings
 from app.core.supabase_client import supabase
+from app.core.http_cache import bump_version
+from app.api.payments import forget_checkout_sessions
 import stripe
 
 router = APIRouter()
@@ -69,6 +71,8 @@ async def stripe_webhook(request: Request):
             "email": customer_email,
             "plan": plan_name
         }).execute()
+        bump_version("user_profile", user_id)
+        forget_checkout_sessions(user_id)
 
         print("✅ Supabase response:", response)
 
@@ -0,0 +1,108 @@
+from fastapi import Request, Response
+from datetime import datetime, timezone
+from email.utils import format_datetime
+import hashlib
+import json
+import threading
+import time
+
+# Snapshots are only trusted for a short while, so rows changed outside this
+# process (Supabase dashboard, another worker) still show up quickly.
+SNAPSHOT_TTL_SECONDS = 30
+MAX_SNAPSHOTS = 1000
+
+_lock = threading.Lock()
+_versions = {}   # (table, owner) -> mutation counter
+_snapshots = {}  # key -> (versions, stored_at, data, etag, last_modified)
+
+
+def bump_version(table: str, owner: str = None):
+    """Record a mutation of `table` (optionally scoped to one user)."""
+    with _lock:
+        scope = (table, owner)
+        _versions[scope] = _versions.get(scope, 0) + 1
+
+
+def _current_versions(scopes):
+    return tuple(_versions.get(scope, 0) for scope in scopes)
+
+
+def compute_etag(data) -> str:
+    body = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return 'W/"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def compute_last_modified(data):
+    rows = data if isinstance(data, list) else [data]
+    latest = None
+    for row in rows:
+        if not isinstance(row, dict) or not row.get("created_at"):
+            continue
+        try:
+            created = datetime.fromisoformat(str(row["created_at"]).replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if created.tzinfo is None:
+            created = created.replace(tzinfo=timezone.utc)
+        if latest is None or created > latest:
+            latest = created
+    if latest is None:
+        return None
+    return format_datetime(latest.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_get(request: Request, response: Response, key: tuple, scopes: list, loader):
+    """
+    Serve a read endpoint with ETag / Last-Modified validators.
+
+    `scopes` are the (table, owner) pairs the result depends on. While none of
+    them has been bumped since the last load (and the snapshot is still fresh)
+    the stored result is reused and `loader` is not called. Returns either the
+    data to send or a bare 304 response when `If-None-Match` matches.
+
+    Last-Modified is derived from `created_at` and is informational only: edits
+    and deletes don't move it, so `If-Modified-Since` is not used for 304s.
+    """
+    now = time.monotonic()
+    with _lock:
+        versions = _current_versions(scopes)
+        snapshot = _snapshots.get(key)
+
+    if snapshot and snapshot[0] == versions and now - snapshot[1] < SNAPSHOT_TTL_SECONDS:
+        _, _, data, etag, last_modified = snapshot
+    else:
+        data = loader()
+        etag = compute_etag(data)
+        last_modified = compute_last_modified(data)
+        with _lock:
+            # Only store if nothing was mutated while the loader ran.
+            if _current_versions(scopes) == versions:
+                _snapshots.pop(key, None)
+                if len(_snapshots) >= MAX_SNAPSHOTS:
+                    _snapshots.pop(next(iter(_snapshots)))
+                _snapshots[key] = (versions, now, data, etag, last_modified)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return data